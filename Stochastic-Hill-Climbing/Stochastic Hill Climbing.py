@@ -3,7 +3,7 @@ from random import randint
 class chess():
     def __init__(self):
         self.board = []
-        self.analyzed = []
+        self.analyzed = set()
         self.h = 0
         for i in range(0,8):
             row = randint(0,7)
@@ -13,18 +13,17 @@ class chess():
         
     def initialize(self):
         self.h = chess.refresh(self.h, self.board)
-        self.analyzed = []
+        self.analyzed = set()
     
     def analyze(self):
         for i in range(1000):
             h = 0
-            queen = chess.chooseQueen()
+            pos_queen, queen = chess.chooseQueen()
             rand = randint(0,7)
             while rand == queen[0]: rand = randint(0,7)  
             new_queen = (rand,queen[1])
 
             new_board = self.board.copy()
-            pos_queen = self.board.index(queen)
             new_board[pos_queen] = new_queen
             
             h = chess.refresh(h,new_board)
@@ -39,18 +38,19 @@ class chess():
         return h
              
     def refresh(self, he, board):
+        board_set = set(board)
         for queen in board:
-            self.analyzed += [queen]
+            self.analyzed.add(queen)
             he = chess.checkHorizontal(board,queen, he)
-            he = chess.checkDiagonal(board,queen, he)
-        self.analyzed = []
+            he = chess.checkDiagonal(board_set,queen, he)
+        self.analyzed = set()
         return he
 
     def chooseQueen(self):
         rand = randint(0,7)
         queen = self.board[rand]
-        self.analyzed += [queen]
-        return queen
+        self.analyzed.add(queen)
+        return rand, queen
 
     def checkHorizontal(self,board, queen, h):
         for i in board: 
@@ -1,11 +1,24 @@
+import os
 import random
 import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Tuple
 
 from genetic.solver import GeneticSolver
+from genetic.state import State
 
 
-def main():
-    random.seed(0)
+def run(seed: int) -> Tuple[int, State, int, int]:
+    """
+    Executa o algoritmo genético uma vez.
+
+    Cada execução é independente das demais e pode ser realizada em um processo diferente.
+
+    :param seed: a seed utilizada pelo gerador de números aleatórios nessa execução.
+    :return: uma tupla contendo a seed, o melhor estado encontrado, o tempo de execução em milissegundos e a geração de
+        parada do algoritmo.
+    """
+    random.seed(seed)
 
     solver = GeneticSolver(
         population_size=20,
@@ -14,21 +27,30 @@ def main():
         generation_size=1000,
     )
 
+    start_time = time.time()
+    result = solver.solve()
+    end_time = time.time()
+    milliseconds = int((end_time - start_time) * 1000)
+
+    return seed, result.best(), milliseconds, solver.current_generation
+
+
+def main():
+    seeds = range(1, 51)
+    workers = os.cpu_count() or 1
+
+    # Envia as seeds em lotes, de forma que cada processo receba poucas tarefas grandes em vez de muitas pequenas
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        rows = list(executor.map(run, seeds, chunksize=max(1, len(seeds) // (4 * workers))))
+
     with open('output.csv', 'w+') as f:
         print('ITER;BEST;FITNESS;TIME;GEN', file=f)
-        for i in range(1, 51):
+        for i, best, milliseconds, generation in rows:
             print(f'{i}', end=';', file=f)
-
-            start_time = time.time()
-            result = solver.solve()
-            end_time = time.time()
-            milliseconds = int((end_time - start_time) * 1000)
-
-            best = result.best()
             print(f'{best}', end=';', file=f)
             print(f'{best.fitness}', end=';', file=f)
             print(f'{milliseconds}', end=';', file=f)
-            print(f'{solver.current_generation}', file=f)
+            print(f'{generation}', file=f)
 
 
 if __name__ == '__main__':
@@ -1,4 +1,4 @@
-from typing import Set
+from typing import Iterable, List
 
 from genetic.state import State
 
@@ -9,7 +9,7 @@ class Solution:
     """
 
     @classmethod
-    def optimal(cls, states: Set[State]):
+    def optimal(cls, states: Iterable[State]):
         """
         Constrói uma solução ótima.
 
@@ -18,7 +18,7 @@ class Solution:
         return cls(states, has_found=True)
 
     @classmethod
-    def non_optimal(cls, states: Set[State]):
+    def non_optimal(cls, states: Iterable[State]):
         """
         Constrói uma solução não ótima.
 
@@ -28,14 +28,15 @@ class Solution:
         """
         return cls(states, has_found=False)
 
-    def __init__(self, states: Set[State], has_found: bool):
+    def __init__(self, states: Iterable[State], has_found: bool):
         """
         Constrói uma solução.
 
-        :param states: os estados que essa solução possui.
+        :param states: os estados que essa solução possui. Estados repetidos são mantidos apenas uma vez.
         :param has_found: se os estados desse solução são ótimos.
         """
-        self.states = states
+        # Remove os estados repetidos pelo inteiro de seus vetores binários, sem recorrer a `State.__eq__`
+        self.states: List[State] = list({int(state.array): state for state in states}.values())
         self.has_found = has_found
 
     def best(self):
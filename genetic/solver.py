@@ -1,10 +1,10 @@
-import heapq
+import itertools
 import random
 from typing import List, Tuple
 
 from genetic.solution import Solution
 from genetic.state import State
-from genetic.utils import pairwise
+from genetic.utils import nlargest_indexes, pairwise
 
 
 class GeneticSolver:
@@ -82,7 +82,8 @@ class GeneticSolver:
         :param states: os estados a serem selecionados.
         :return: os estados selecionados.
         """
-        return random.choices(states, weights=[state.fitness for state in states], k=len(states))
+        cum_weights = list(itertools.accumulate(State.batch_fitness(states)))
+        return random.choices(states, cum_weights=cum_weights, k=len(states))
 
     @staticmethod
     def _tournament_selection(states: List[State]) -> List[State]:
@@ -94,7 +95,99 @@ class GeneticSolver:
         :param states: os estados a serem selecionados.
         :return: os estados selecionados.
         """
-        return [max(random.choices(states, k=2), key=lambda s: s.fitness) for _ in states]
+        return [states[i] for i in GeneticSolver._tournament_winners(states)]
+
+    @staticmethod
+    def _tournament_winners(states: List[State]) -> List[int]:
+        """
+        Realiza um torneio para cada estado da população.
+
+        :param states: os estados a serem selecionados.
+        :return: os índices dos vencedores de cada torneio.
+        """
+        fitnesses = State.batch_fitness(states)
+
+        # Sorteia de uma só vez os dois competidores de cada torneio. Em caso de empate, vence o primeiro competidor.
+        contenders = random.choices(range(len(states)), k=2 * len(states))
+        it = iter(contenders)
+        return [i0 if fitnesses[i0] >= fitnesses[i1] else i1 for i0, i1 in zip(it, it)]
+
+    @staticmethod
+    def _draw_events(size: int, rate: float) -> List[bool]:
+        """
+        Sorteia de uma só vez a ocorrência de vários eventos independentes, como cruzamentos ou mutações.
+
+        :param size: o número de eventos a serem sorteados.
+        :param rate: a probabilidade de cada evento ocorrer.
+        :return: se cada evento ocorre.
+        """
+        random_ = random.random
+        return [random_() <= rate for _ in range(size)]
+
+    def _evolve(self, states: List[State]) -> List[State]:
+        """
+        Executa uma geração do algoritmo: seleção, cruzamento, mutação e seleção natural.
+
+        :param states: a população da geração atual.
+        :return: a população da próxima geração, ordenada do melhor para o pior estado.
+        """
+        # Seleção
+        selected_states: List[State] = self._select_states(states, strategy='tournament')
+
+        # Crossover
+        parent_states: List[Tuple[State, State]] = pairwise(selected_states)
+        crossings: List[bool] = self._draw_events(len(parent_states), self._crossing_rate)
+        cutoffs = iter(State.random_cutoffs(sum(crossings)))
+        children_states: List[State] = []
+        for (parent_state_0, parent_state_1), crossing in zip(parent_states, crossings):
+            if crossing:
+                # Ocorre cruzamento entre os pais
+                child_state_0, child_state_1 = parent_state_0.cross(parent_state_1, 'cutoff', next(cutoffs))
+                children_states.append(child_state_0)
+                children_states.append(child_state_1)
+            else:
+                # Os pais se tornam filhos
+                children_states.append(parent_state_0)
+                children_states.append(parent_state_1)
+
+        # Mutação
+        mutations: List[bool] = self._draw_events(len(children_states), self._mutation_rate)
+        for state, mutation in zip(children_states, mutations):
+            if mutation:
+                # Ocorre mutação no indivíduo
+                state.mutate(strategy='bitflip')
+
+        # Junta os filhos gerados com os pais
+        children_states.extend(states)
+        fitnesses: List[int] = State.batch_fitness(children_states)
+
+        # Seleciona apenas os melhores estados
+        return [children_states[i] for i in nlargest_indexes(fitnesses, self._population_size)]
+
+    def _on_population_created(self, states: List[State]):
+        """
+        Define uma ação a ser realizada quando a população inicial é criada.
+
+        :param states: a população inicial.
+        """
+        pass
+
+    def _on_new_generation(self):
+        """
+        Define uma ação a ser realizada quando o algoritmo passa para a próxima geração.
+
+        O número da nova geração está disponível no atributo `current_generation`.
+        """
+        pass
+
+    def _on_finish(self, states: List[State], has_found: bool):
+        """
+        Define uma ação a ser realizada quando o algoritmo termina.
+
+        :param states: a população da última geração.
+        :param has_found: se uma solução ótima foi encontrada.
+        """
+        pass
 
     def solve(self) -> Solution:
         """
@@ -106,43 +199,23 @@ class GeneticSolver:
 
         # População inicial
         states: List[State] = self._create_states(self._population_size)
+        self._on_population_created(states)
+
         optimal_states: List[State] = [state for state in states if state.is_optimal]
         while not optimal_states:
-            # Seleção
-            selected_states: List[State] = self._select_states(states, strategy='tournament')
-
-            # Crossover
-            parent_states: List[Tuple[State, State]] = pairwise(selected_states)
-            children_states: List[State] = []
-            for parent_state_0, parent_state_1 in parent_states:
-                if random.random() <= self._crossing_rate:
-                    # Ocorre cruzamento entre os pais
-                    child_state_0, child_state_1 = parent_state_0.cross(parent_state_1, strategy='cutoff')
-                    children_states.append(child_state_0)
-                    children_states.append(child_state_1)
-                else:
-                    # Os pais se tornam filhos
-                    children_states.append(parent_state_0)
-                    children_states.append(parent_state_1)
-
-            # Mutação
-            for state in children_states:
-                if random.random() <= self._mutation_rate:
-                    # Ocorre mutação no indivíduo
-                    state.mutate(strategy='bitflip')
-
-            # Junta os filhos gerados com os pais
-            children_states.extend(states)
-
-            # Utiliza um heap máximo para selecionar apenas os melhores estados
-            states = heapq.nlargest(self._population_size, children_states, key=lambda s: s.fitness)
-
-            optimal_states = [state for state in states if state.is_optimal]
+            states = self._evolve(states)
+
+            # Como a população está ordenada, os estados ótimos, caso existam, são os primeiros. Na maioria das
+            # gerações, basta verificar o primeiro estado.
+            optimal_states = list(itertools.takewhile(lambda s: s.is_optimal, states))
             if optimal_states:
                 break
 
             self.current_generation += 1
+            self._on_new_generation()
             if self.current_generation == self._generation_size:
-                return Solution.non_optimal(set(states))
+                self._on_finish(states, has_found=False)
+                return Solution.non_optimal(states)
 
-        return Solution.optimal(set(optimal_states))
+        self._on_finish(states, has_found=True)
+        return Solution.optimal(optimal_states)
@@ -1,14 +1,158 @@
+import functools
 import random
-from typing import Tuple
+from typing import List, Optional, Tuple
 
 from genetic.utils import BitArray
 
+_COLUMNS = tuple(range(8))
+"""
+Os índices das colunas do tabuleiro.
+"""
+
+_VALID_ROWS = frozenset(_COLUMNS)
+"""
+As linhas válidas para a rainha de uma coluna.
+"""
+
+_BITS_SIZE = (len(_COLUMNS) - 1).bit_length()
+"""
+O número de bits utilizados para armazenar a linha da rainha de cada coluna.
+"""
+
+_BITS_MASK = (1 << _BITS_SIZE) - 1
+"""
+A máscara que isola os bits de uma coluna.
+"""
+
+
+def _lines_mask(column: int, row: int) -> int:
+    """
+    Marca a linha e as duas diagonais ocupadas por uma rainha em um único inteiro.
+
+    Os 8 bits menos significantes representam as linhas, os 15 bits seguintes as diagonais `linha + coluna` e os 15
+    bits seguintes as diagonais `linha - coluna + 7`.
+
+    :param column: a coluna da rainha.
+    :param row: a linha da rainha.
+    :return: um inteiro com os bits da linha e das diagonais da rainha definidos.
+    """
+    return 1 << row | 1 << (8 + row + column) | 1 << (23 + row - column + 7)
+
+
+_LINES_MASKS = tuple(tuple(_lines_mask(column, row) for row in _COLUMNS) for column in _COLUMNS)
+"""
+As linhas e diagonais ocupadas por uma rainha, indexadas pela coluna e pela linha da rainha.
+"""
+
+_CUTOFFS = range(1, len(_COLUMNS) - 1)
+"""
+Os pontos de corte possíveis de um cruzamento. Com o ponto de corte `cutoff`, cada filho recebe os elementos
+0-`cutoff` de um pai e os demais do outro.
+"""
+
+_CUTOFF_MASKS = tuple(-1 << _BITS_SIZE * (cutoff + 1) for cutoff in _COLUMNS)
+"""
+As máscaras que isolam os bits dos elementos após cada ponto de corte, indexadas pelo ponto de corte.
+"""
+
+_SPLIT_MASKS = tuple(
+    sum(_BITS_MASK << _BITS_SIZE * column for column in _COLUMNS if split >> column & 1)
+    for split in range(1 << len(_COLUMNS))
+)
+"""
+As máscaras que isolam os bits dos elementos selecionados por um vetor de cruzamento uniforme, indexadas pelo vetor,
+onde o bit i indica se o elemento i é selecionado.
+"""
+
+_HALF_SIZE = _BITS_SIZE * len(_COLUMNS) // 2
+"""
+O número de bits que armazenam as linhas das rainhas de metade das colunas do tabuleiro.
+"""
+
+_HALF_MASK = (1 << _HALF_SIZE) - 1
+"""
+A máscara que isola os bits da primeira metade das colunas.
+"""
+
+
+def _half_lines_masks(columns: Tuple[int, ...]) -> Tuple[int, ...]:
+    """
+    Calcula a união das linhas e diagonais ocupadas pelas rainhas de metade das colunas do tabuleiro, para todas as
+    possíveis posições dessas rainhas.
+
+    :param columns: as colunas da metade do tabuleiro.
+    :return: as uniões das máscaras de `_LINES_MASKS`, indexadas pelos bits que armazenam as linhas dessas colunas.
+    """
+    masks = [0]
+    # Cada coluna acrescenta _BITS_SIZE bits ao índice, acima dos bits das colunas anteriores
+    for i, column in enumerate(columns):
+        shift = _BITS_SIZE * i
+        masks = [masks[packed & ((1 << shift) - 1)] | _LINES_MASKS[column][packed >> shift]
+                 for packed in range(1 << (shift + _BITS_SIZE))]
+    return tuple(masks)
+
+
+_LOW_LINES_MASKS = _half_lines_masks(_COLUMNS[:len(_COLUMNS) // 2])
+"""
+As linhas e diagonais ocupadas pelas rainhas da primeira metade das colunas, indexadas pelos bits menos significantes
+do vetor binário.
+"""
+
+_HIGH_LINES_MASKS = _half_lines_masks(_COLUMNS[len(_COLUMNS) // 2:])
+"""
+As linhas e diagonais ocupadas pelas rainhas da segunda metade das colunas, indexadas pelos bits mais significantes do
+vetor binário.
+"""
+
+
+def _bin_count(value: int) -> int:
+    """
+    Conta os bits definidos de um inteiro não negativo.
+
+    :param value: o inteiro.
+    :return: o número de bits definidos.
+    """
+    return bin(value).count('1')
+
+
+# `int.bit_count` está disponível a partir do Python 3.10
+_popcount = getattr(int, 'bit_count', _bin_count)
+"""
+Conta os bits definidos de um inteiro não negativo.
+"""
+
+
+@functools.lru_cache(maxsize=1 << 16)
+def _count_conflicts(packed: int) -> int:
+    """
+    Conta os ataques entre as rainhas de um tabuleiro.
+
+    Uma linha (ou diagonal) ocupada por k rainhas contribui com k - 1 ataques, já que cada rainha dela, exceto a última,
+    ataca a próxima rainha na mesma direção. Basta, portanto, contar as linhas e diagonais distintas ocupadas, que são
+    os bits definidos na união das máscaras de `_LINES_MASKS` de cada rainha.
+
+    A união é obtida com apenas duas consultas, uma em `_LOW_LINES_MASKS` e outra em `_HIGH_LINES_MASKS`, sem iterar
+    sobre as colunas.
+
+    Como o resultado depende apenas do inteiro recebido, os valores já calculados são armazenados, de forma que estados
+    repetidos entre gerações não sejam avaliados novamente.
+
+    :param packed: o número inteiro que suporta o vetor binário do estado, com 3 bits para cada uma das 8 colunas.
+    :return: o número de ataques entre as rainhas.
+    """
+    occupied = _LOW_LINES_MASKS[packed & _HALF_MASK] | _HIGH_LINES_MASKS[packed >> _HALF_SIZE]
+
+    # Cada uma das 8 rainhas ocupa uma linha e duas diagonais
+    return 3 * len(_COLUMNS) - _popcount(occupied)
+
 
 class State:
     """
     Representa uma solução candidata para o Problema das Oito Rainhas.
     """
 
+    __slots__ = ('array', '_fitness')
+
     _MAX_FITNESS = 28
     """
     Representa o valor da função fitness ótimo para esse estado.
@@ -21,12 +165,27 @@ class State:
         :param array: um vetor binário onde cada posição representa uma coluna do tabuleiro e cada valor representa a
             linha da coluna onde a rainha está posicionada nesse tabuleiro.
         """
-        valid_range = range(8)
         # Itera sobre as 8 primeiros grupos de bits (elementos) desse vetor
-        if any(value not in valid_range for value in array.iterate(8)):
-            raise ValueError(f"todos os valores do vetor devem estar entre {valid_range.start}-{valid_range.stop}")
+        if not all(value in _VALID_ROWS for value in array.iterate(len(_COLUMNS))):
+            raise ValueError("todos os valores do vetor devem estar entre 0-8")
 
         self.array = array
+        self._fitness: Optional[int] = None
+
+    @classmethod
+    def _unchecked(cls, array: BitArray):
+        """
+        Constrói um estado sem validar o vetor binário.
+
+        Deve ser utilizado apenas quando o vetor é válido por construção, como nos resultados de um cruzamento.
+
+        :param array: o vetor binário do estado.
+        :return: o estado criado.
+        """
+        state = object.__new__(cls)
+        state.array = array
+        state._fitness = None
+        return state
 
     @classmethod
     def random(cls):
@@ -35,7 +194,28 @@ class State:
         :return: o estado criado.
         """
         # random.sample(range(8), 8) == (values = list(range(8)); random.shuffle(values))
-        return cls(BitArray.from_list(random.sample(range(8), 8), 3))
+        return cls._unchecked(BitArray.from_list(random.sample(_COLUMNS, len(_COLUMNS)), _BITS_SIZE))
+
+    @staticmethod
+    def batch_fitness(states: List['State']) -> List[int]:
+        """
+        Calcula a função fitness de uma lista de estados de uma só vez.
+
+        Os valores calculados ficam armazenados em cada estado, de forma que acessos posteriores ao atributo `fitness`
+        não os recalculam.
+
+        :param states: os estados a serem avaliados.
+        :return: os valores da função fitness de cada estado, na mesma ordem da lista.
+        """
+        # Avalia os estados diretamente, sem passar pela propriedade `fitness` de cada um
+        max_fitness = State._MAX_FITNESS
+        fitnesses = []
+        for state in states:
+            fitness = state._fitness
+            if fitness is None:
+                fitness = state._fitness = max_fitness - _count_conflicts(int(state.array))
+            fitnesses.append(fitness)
+        return fitnesses
 
     @property
     def is_optimal(self) -> bool:
@@ -47,71 +227,79 @@ class State:
     @property
     def fitness(self) -> int:
         """
-        Calcula a função fitness para esse estado no contexto do Problema das Oito Rainhas.
+        Retorna o valor da função fitness para esse estado.
+
+        O valor é calculado apenas no primeiro acesso e reutilizado até que esse estado sofra uma mutação.
 
         :return: o número de pares únicos de rainhas que não se atacam entre si.
         """
-        total = self._MAX_FITNESS
-        array = list(self.array.iterate(8))
-
-        # Remove as rainhas da mesma coluna do total
-        unique_values = len(set(array))
-        total -= 8 - unique_values
+        if self._fitness is None:
+            self._fitness = self._compute_fitness()
+        return self._fitness
 
-        for i, v0 in enumerate(array):
-            # Monitora as direções que uma rainha atacada foi encontrada. Se 'topleft' for
-            # `True`, por exemplo, uma rainha foi atacada na diagonal superior esquerda.
-            directions = {
-                'topleft': False,
-                'bottomleft': False,
-                'topright': False,
-                'bottomright': False,
-            }
-
-            # Itera sobre os elementos à direita de v0 no vetor
-            for j, v1 in enumerate(array[i + 1:], start=i + 1):
-                dx = j - i
-                dy = v1 - v0
+    def _compute_fitness(self) -> int:
+        """
+        Calcula a função fitness para esse estado no contexto do Problema das Oito Rainhas.
 
-                direction = ''
-                direction += 'top' if dy < 0 else 'bottom'
-                direction += 'left' if dx < 0 else 'right'
+        :return: o número de pares únicos de rainhas que não se atacam entre si.
+        """
+        return self._MAX_FITNESS - _count_conflicts(int(self.array))
 
-                # Verifica se existe alguma rainha na mesma diagonal apenas
-                # se ainda não tiver ocorrido nenhum conflito nessa direção.
-                if not directions[direction] and abs(dx) == abs(dy):
-                    directions[direction] = True
-                    total -= 1
+    @staticmethod
+    def random_cutoffs(size: int) -> List[int]:
+        """
+        Sorteia de uma só vez os pontos de corte de vários cruzamentos.
 
-        return total
+        :param size: o número de pontos de corte a serem sorteados.
+        :return: os pontos de corte, que podem ser passados para o método `cross`.
+        """
+        return random.choices(_CUTOFFS, k=size)
 
-    def cross(self, other, strategy='cutoff') -> Tuple['State', 'State']:
+    def cross(self, other, strategy='cutoff', cutoff: Optional[int] = None) -> Tuple['State', 'State']:
         """
         Troca material genético com outro estado.
 
         :param other: o outro estado.
         :param strategy: o nome da estratégia de cruzamento a ser utilizada, podendo ser 'cutoff' (utiliza um ponto de
             corte) ou  'uniform' (utiliza um vetor binário).
+        :param cutoff: o ponto de corte da estratégia 'cutoff', como os sorteados por `random_cutoffs`. Caso não seja
+            informado, o ponto de corte é sorteado nesse cruzamento.
         :return: o resultado do cruzamento entre esses dois estados.
         """
         if strategy == 'cutoff':
-            return self._cutoff_cross(other)
+            return self._cutoff_cross(other, cutoff)
         if strategy == 'uniform':
             return self._uniform_cross(other)
 
         raise ValueError("estratégia de cruzamento inválida")
 
-    def _cutoff_cross(self, other: 'State') -> Tuple['State', 'State']:
+    def _cutoff_cross(self, other: 'State', cutoff: Optional[int] = None) -> Tuple['State', 'State']:
         """
         Troca material genético com outro estado por meio de um ponto de corte.
 
         :param other: o outro estado.
+        :param cutoff: o ponto de corte. Caso não seja informado, é sorteado.
         :return: o resultado do cruzamento entre esses dois estados.
         """
-        cutoff = random.choice(range(1, 7))
-        array_0 = BitArray.from_list([self.array[i] if i <= cutoff else other.array[i] for i in range(8)], 3)
-        array_1 = BitArray.from_list([self.array[i] if i > cutoff else other.array[i] for i in range(8)], 3)
-        return State(array_0), State(array_1)
+        if cutoff is None:
+            cutoff, = State.random_cutoffs(1)
+        return self._cutoff_splice(other, cutoff)
+
+    def _cutoff_splice(self, other: 'State', cutoff: int) -> Tuple['State', 'State']:
+        """
+        Troca material genético com outro estado a partir de um ponto de corte já sorteado.
+
+        :param other: o outro estado.
+        :param cutoff: o índice do último elemento de cada estado que é mantido no seu primeiro filho.
+        :return: o resultado do cruzamento entre esses dois estados, do mesmo tipo desse estado.
+        """
+        # Os elementos após o ponto de corte são trocados entre os vetores: os bits em que eles diferem são invertidos
+        # em ambos
+        packed_0, packed_1 = int(self.array), int(other.array)
+        diff = (packed_0 ^ packed_1) & _CUTOFF_MASKS[cutoff]
+        array_0 = BitArray.from_int(packed_0 ^ diff, _BITS_SIZE)
+        array_1 = BitArray.from_int(packed_1 ^ diff, _BITS_SIZE)
+        return type(self)._unchecked(array_0), type(self)._unchecked(array_1)
 
     def _uniform_cross(self, other) -> Tuple['State', 'State']:
         """
@@ -120,13 +308,13 @@ class State:
         :param other: o outro estado.
         :return: o resultado do cruzamento entre esses dois estados.
         """
-        # random.getrandbits(1) == random.randint(0, 1)
-        split_0 = [random.getrandbits(1) for _ in range(8)]
-        array_0 = BitArray.from_list([self.array[i] if v == 0 else other.array[i] for i, v in enumerate(split_0)], 3)
-
-        split_1 = [random.getrandbits(1) for _ in range(8)]
-        array_1 = BitArray.from_list([self.array[i] if v == 0 else other.array[i] for i, v in enumerate(split_1)], 3)
-        return State(array_0), State(array_1)
+        # Cada bit do vetor sorteado indica a origem de um elemento: 0 para esse estado e 1 para o outro estado. Os
+        # elementos vindos do outro estado são obtidos invertendo os bits em que os dois estados diferem.
+        packed_0, packed_1 = int(self.array), int(other.array)
+        diff = packed_0 ^ packed_1
+        array_0 = BitArray.from_int(packed_0 ^ (diff & _SPLIT_MASKS[random.getrandbits(len(_COLUMNS))]), _BITS_SIZE)
+        array_1 = BitArray.from_int(packed_0 ^ (diff & _SPLIT_MASKS[random.getrandbits(len(_COLUMNS))]), _BITS_SIZE)
+        return type(self)._unchecked(array_0), type(self)._unchecked(array_1)
 
     def mutate(self, strategy='bitflip'):
         """
@@ -148,9 +336,10 @@ class State:
 
         Escolhem-se aleatoriamente um elemento e uma posição para modificar o bit.
         """
-        arr_index = random.choice(range(8))
-        bit_index = random.choice(range(3))
-        self.array[arr_index] ^= 1 << bit_index
+        # Cada bit do vetor é um par (elemento, posição) distinto, então basta sortear a posição do bit no número
+        # inteiro que suporta o vetor, onde o bit j do elemento i está na posição i * 3 + j.
+        self.array.flip(random.randrange(len(_COLUMNS) * _BITS_SIZE))
+        self._fitness = None
 
     def _permutation_mutation(self):
         """
@@ -158,8 +347,9 @@ class State:
 
         Escolhem-se aleatoriamente duas posições do vetor e a permutam.
         """
-        i0, i1 = random.sample(range(8), 2)
+        i0, i1 = random.sample(_COLUMNS, 2)
         self.array[i0], self.array[i1] = self.array[i1], self.array[i0]
+        self._fitness = None
 
     def __hash__(self) -> int:
         return hash(self.array)
@@ -1,9 +1,15 @@
 import math
 import re
-from typing import TypeVar, List, Tuple, Generator
+from typing import Dict, TypeVar, List, Tuple, Generator, Pattern
 
 T = TypeVar('T')
 
+_REPR_PATTERNS: Dict[int, Pattern] = {}
+"""
+As expressões regulares que separam os grupos de bits na representação de um vetor binário, indexadas pelo número de
+bits de agrupamento.
+"""
+
 
 class BitArray:
     """
@@ -16,6 +22,8 @@ class BitArray:
     Todas as operações de busca por índice, inserção e remoção são feitas por meio de operadores bit-a-bit.
     """
 
+    __slots__ = ('_array', '_group_size', '_mask')
+
     def __init__(self, group_size: int, /):
         """
         Constrói um vetor binário.
@@ -37,8 +45,24 @@ class BitArray:
         :param group_size: o número de bits a ser armazenado para cada elemento da lista.
         """
         array = cls(group_size)
+        packed = 0
         for i, value in enumerate(list_):
-            array[i] = value
+            packed |= (value & array._mask) << (group_size * i)
+        array._array = packed
+        return array
+
+    @classmethod
+    def from_int(cls, value: int, /, group_size: int):
+        """
+        Constrói um vetor binário a partir do número inteiro que o suporta.
+
+        >>> BitArray.from_int(0b100010011, 3)    # 100 010 011
+
+        :param value: o número inteiro, não negativo, cujos bits formarão o vetor binário.
+        :param group_size: o número de bits que serão agrupados em cada índice do vetor.
+        """
+        array = cls(group_size)
+        array._array = value
         return array
 
     def __setitem__(self, index: int, value: int):
@@ -54,9 +78,8 @@ class BitArray:
         :param value: o valor a ser inserido. Caso o número de bits desse valor seja maior que o número de bits de
             agrupamento `n`, serão inseridos apenas os `n` bits mais significantes desse número.
         """
-        value &= self._mask
-        del self[index]
-        self._array |= value << (self._group_size * index)
+        shift = self._group_size * index
+        self._array = self._array & ~(self._mask << shift) | (value & self._mask) << shift
 
     def __getitem__(self, index: int) -> int:
         """
@@ -91,6 +114,20 @@ class BitArray:
         """
         self._array &= ~(self._mask << (self._group_size * index))
 
+    def flip(self, position: int):
+        """
+        Inverte um bit desse vetor binário.
+
+        >>> array = BitArray.from_int(0b101010, 3)
+        >>> array    # 101 010
+        >>> array.flip(4)
+        >>> array    # 111 010
+
+        :param position: a posição do bit no número inteiro que suporta esse vetor, de forma que o bit `j` do elemento
+            `i` está na posição `i * n + j`, sendo `n` o número de bits de agrupamento.
+        """
+        self._array ^= 1 << position
+
     def iterate(self, length: int) -> Generator[int, None, None]:
         """
         Itera sobre os grupos de bits mais significantes desse vetor.
@@ -109,12 +146,28 @@ class BitArray:
         :param step: o passo da iteração.
         :return: um gerador com os grupos de bits do intervalo especificado desse vetor.
         """
+        # Equivale a `self[i]` para cada índice, sem o custo de uma chamada de método por elemento
+        array, group_size, mask = self._array, self._group_size, self._mask
         for i in range(start, stop, step):
-            yield self[i]
+            if i < 0:
+                raise ValueError("esse valor não pode ser negativo")
+            yield array >> (group_size * i) & mask
+
+    def __int__(self) -> int:
+        """
+        :return: o número inteiro que suporta esse vetor binário.
+        """
+        return self._array
 
     def __hash__(self):
         return self._array
 
+    def __eq__(self, other: 'BitArray') -> bool:
+        if not isinstance(other, BitArray):
+            return NotImplemented
+        # Dois vetores são iguais se agrupam os bits da mesma forma e são suportados pelo mesmo número inteiro
+        return self._group_size == other._group_size and self._array == other._array
+
     def __repr__(self) -> str:
         """
         :return: uma representação dos bits definidos nesse vetor.
@@ -129,8 +182,12 @@ class BitArray:
             new_len = math.ceil(len(int_repr) / self._group_size) * self._group_size
             int_repr = int_repr.zfill(new_len)
 
-        # Transforma '001010111' em '001 010 111'
-        return re.sub(rf'(?<!^)(?=(\d{{{self._group_size}}})+$)', r' ', int_repr)
+        # Transforma '001010111' em '001 010 111'. A expressão regular é compilada apenas uma vez para cada número de
+        # bits de agrupamento.
+        pattern = _REPR_PATTERNS.get(self._group_size)
+        if pattern is None:
+            pattern = _REPR_PATTERNS[self._group_size] = re.compile(rf'(?<!^)(?=(\d{{{self._group_size}}})+$)')
+        return pattern.sub(r' ', int_repr)
 
 
 def pairwise(array: List[T]) -> List[Tuple[T, T]]:
@@ -145,7 +202,35 @@ def pairwise(array: List[T]) -> List[Tuple[T, T]]:
     :param array: o vetor a ser agrupado.
     :return: os pares de elementos consecutivos desse vetor.
     """
-    pairs = [(v0, v1) for v0, v1 in zip(array[::2], array[1::2])]
+    # Consome o mesmo iterador duas vezes a cada par, sem criar as duas metades do vetor
+    it = iter(array)
+    pairs = list(zip(it, it))
     if len(array) % 2 == 1:
         pairs.append((array[-1], array[0]))
     return pairs
+
+
+def nlargest_indexes(values: List[int], n: int) -> List[int]:
+    """
+    Retorna os índices dos `n` maiores valores de uma lista de inteiros não negativos.
+
+    O resultado é o mesmo de `heapq.nlargest(n, range(len(values)), key=values.__getitem__)`, mas, como os valores
+    pertencem a um intervalo pequeno (como os valores da função fitness), os índices são agrupados por valor em tempo
+    linear em vez de ordenados. Índices de valores iguais mantêm a ordem em que aparecem na lista.
+
+    >>> nlargest_indexes([3, 7, 1, 7, 5], 3)    # [1, 3, 4]
+
+    :param values: os valores a serem comparados.
+    :param n: o número de índices a serem retornados.
+    :return: os índices dos maiores valores, do maior para o menor.
+    """
+    buckets: List[List[int]] = [[] for _ in range(max(values) + 1)]
+    for i, value in enumerate(values):
+        buckets[value].append(i)
+
+    indexes: List[int] = []
+    for bucket in reversed(buckets):
+        indexes.extend(bucket)
+        if len(indexes) >= n:
+            break
+    return indexes[:n]
@@ -1,19 +1,28 @@
+import functools
+import glob
 import os
 import random
 import shutil
 import threading
 import tkinter as tk
 import tkinter.ttk as ttk
-from typing import Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional
 
 from PIL import Image
 from PIL import ImageTk
 
 from genetic.solver import GeneticSolver
-from genetic_applet import utils
+from genetic_applet import imaging, utils
 from genetic_applet.solver import AppletGeneticSolver, GeneticSolverListener
 
 
+_PREFETCH_RADIUS = 2
+"""
+O número de imagens carregadas antes e depois da imagem mostrada pelo applet.
+"""
+
+
 def run():
     """
     Executa o applet.
@@ -23,10 +32,16 @@ def run():
     root.mainloop()
 
 
-def _get_generations():
+@functools.lru_cache(maxsize=256)
+def _get_generations(seed: int):
     """
+    Como o algoritmo é determinado pela seed, o resultado é armazenado para cada seed, de forma que o algoritmo não seja
+    executado novamente quando a mesma seed é inserida.
+
+    :param seed: a seed utilizada pelo gerador de números aleatórios.
     :return: o número de gerações que o algoritmo genético encontra uma solução ótima.
     """
+    random.seed(seed)
     solver: GeneticSolver = GeneticSolver(
         population_size=20,
         crossing_rate=0.8,
@@ -37,6 +52,19 @@ def _get_generations():
     return solver.current_generation
 
 
+def _load_img(number: int) -> Image.Image:
+    """
+    Carrega uma imagem gerada pelo algoritmo, já redimensionada para ser mostrada pelo applet.
+
+    :param number: o número da imagem.
+    :return: a imagem redimensionada.
+    """
+    dir_path = utils.get_child("imgs")
+    filepath = os.path.join(dir_path, f"output_{number:07d}.png")
+    img = Image.open(filepath)
+    return img.resize((600, 600), imaging.LANCZOS)
+
+
 class Applet(tk.Frame, GeneticSolverListener):
     """
     Interface gráfica do applet do algoritmo genético.
@@ -49,6 +77,10 @@ class Applet(tk.Frame, GeneticSolverListener):
         self._img_number: Optional[int] = None
         self._img_max_number: Optional[int] = None
 
+        # As imagens vizinhas da imagem mostrada são carregadas e redimensionadas fora da thread de interface gráfica
+        self._img_executor = ThreadPoolExecutor(max_workers=2)
+        self._img_cache: Dict[int, Future] = {}
+
         self._root = root
         self._root.title("Genetic Solver Applet")
         tk.Label(self._root, text="Insira uma seed:").grid(row=0, column=0)
@@ -85,6 +117,20 @@ class Applet(tk.Frame, GeneticSolverListener):
 
         solver.solve()
 
+    def _prefetch_images(self):
+        """
+        Agenda o carregamento das imagens próximas da imagem mostrada e descarta as demais.
+
+        Apenas algumas imagens são mantidas em memória, já que um algoritmo que chega ao limite de gerações cria cerca
+        de mil imagens.
+        """
+        first = max(0, self._img_number - _PREFETCH_RADIUS)
+        last = min(self._img_max_number, self._img_number + _PREFETCH_RADIUS)
+        self._img_cache = {
+            number: self._img_cache.get(number) or self._img_executor.submit(_load_img, number)
+            for number in range(first, last + 1)
+        }
+
     def _on_create_seed(self):
         """
         Define uma ação a ser realizada quando o usuário insere uma seed.
@@ -98,8 +144,7 @@ class Applet(tk.Frame, GeneticSolverListener):
         except ValueError:
             seed = hash(seed)
 
-        random.seed(seed)
-        gens = _get_generations()
+        gens = _get_generations(seed)
 
         random.seed(seed)
         self._var_gen = tk.IntVar()
@@ -112,6 +157,7 @@ class Applet(tk.Frame, GeneticSolverListener):
         )
         self._w_pbr_gens.grid(row=2, column=0, columnspan=3)
 
+        self._img_cache = {}
         threading.Thread(target=self._solve).start()
 
     def on_new_generation(self, number: int):
@@ -126,11 +172,12 @@ class Applet(tk.Frame, GeneticSolverListener):
         """
         :return: a imagem a ser mostrada pelo applet.
         """
-        dir_path = utils.get_child("imgs")
-        filepath = os.path.join(dir_path, f"output_{self._img_number:07d}.png")
-        img = Image.open(filepath)
-        img = img.resize((600, 600), Image.ANTIALIAS)
-        return ImageTk.PhotoImage(img)
+        # Apenas a criação da `PhotoImage` precisa ocorrer na thread de interface gráfica
+        future = self._img_cache.get(self._img_number)
+        if future is None:
+            # A imagem é carregada pelo executor e armazenada, de forma que `_prefetch_images` não a carregue novamente
+            future = self._img_cache[self._img_number] = self._img_executor.submit(_load_img, self._img_number)
+        return ImageTk.PhotoImage(future.result())
 
     def _fetch_image(self):
         """
@@ -139,6 +186,7 @@ class Applet(tk.Frame, GeneticSolverListener):
         img_tk = self._get_img_tk()
         self._w_lbl_img.configure(image=img_tk)
         self._w_lbl_img.image = img_tk
+        self._prefetch_images()
 
     def on_previous(self):
         """
@@ -170,7 +218,8 @@ class Applet(tk.Frame, GeneticSolverListener):
         """
         super().on_finish()
         dir_path = utils.get_child("imgs")
-        self._img_max_number = len(os.listdir(dir_path)) - 1
+        # O diretório também pode conter o arquivo .gif, caso as imagens sejam mantidas
+        self._img_max_number = len(glob.glob(os.path.join(dir_path, "output_*.png"))) - 1
 
         self._w_pbr_gens.grid_forget()
         self._w_btn_next.grid(row=2, column=2)
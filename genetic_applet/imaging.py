@@ -1,17 +1,26 @@
+import functools
 import glob
 import math
 import os
-import statistics
-from typing import List, Callable, Tuple, Set, Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Callable, Tuple, Set, Optional
 
 import PIL.Image
 import PIL.ImageDraw
 import PIL.ImageFont
 
 from genetic.state import State
+from genetic.utils import BitArray
 from genetic_applet import utils
 
 
+LANCZOS = getattr(PIL.Image, 'Resampling', PIL.Image).LANCZOS
+"""
+O filtro de redimensionamento das imagens. `PIL.Image.Resampling` está disponível a partir do Pillow 9.1, que passou a
+desencorajar as constantes antigas.
+"""
+
+
 def _is_perfect_square(x: float) -> bool:
     """
     Verifica se um número é um quadrado perfeito.
@@ -55,10 +64,13 @@ def _copy(img: PIL.Image) -> PIL.Image:
     return img_copy
 
 
+@functools.lru_cache(maxsize=32)
 def _parse_color(color: int) -> Tuple[int, int, int, int]:
     """
     Interpreta uma cor no formato 0xAARRGGBB.
 
+    As imagens utilizam poucas cores, então cada cor é interpretada apenas uma vez.
+
     :param color: a cor a ser interpretada.
     :return: uma tupla de valores no formato (RR, GG, BB, AA).
     """
@@ -69,20 +81,149 @@ def _parse_color(color: int) -> Tuple[int, int, int, int]:
     return c_r, c_g, c_b, c_a
 
 
+def _describe_fitness(states: List[State]) -> str:
+    """
+    Descreve o melhor, o pior e a média dos valores da função fitness de uma lista de estados.
+
+    :param states: os estados a serem descritos.
+    :return: uma linha de texto para cada valor.
+    """
+    fitnesses = State.batch_fitness(states)
+    total, size = sum(fitnesses), len(fitnesses)
+    # Assim como em `statistics.mean`, a média é mostrada como um inteiro caso a divisão seja exata
+    mean = total // size if total % size == 0 else total / size
+    return (
+        f"Melhor fitness: {max(fitnesses)}\n"
+        f"Pior fitness: {min(fitnesses)}\n"
+        f"Média de fitness: {mean}\n"
+    )
+
+
+@functools.lru_cache(maxsize=1024)
+def _packed_columns(packed: int) -> Tuple[int, ...]:
+    """
+    Calcula as colunas das rainhas de um vetor binário, no formato esperado por `BoardBuilder.create`.
+
+    :param packed: o número inteiro que suporta o vetor binário.
+    :return: as colunas de cada rainha, começando em 1.
+    """
+    return tuple(v + 1 for v in BitArray.from_int(packed, 3).iterate(8))
+
+
+def _columns(state: State) -> Tuple[int, ...]:
+    """
+    Calcula as colunas das rainhas de um estado, no formato esperado por `BoardBuilder.create`.
+
+    Como um mesmo estado é desenhado em várias etapas de uma geração, as colunas são calculadas apenas uma vez para
+    cada vetor binário.
+
+    :param state: o estado.
+    :return: as colunas de cada rainha, começando em 1.
+    """
+    return _packed_columns(int(state.array))
+
+
+@functools.lru_cache(maxsize=None)
+def _solid_img(size: Tuple[int, int], color: int) -> PIL.Image:
+    """
+    Cria uma imagem preenchida por uma única cor.
+
+    Como as pinturas dos tabuleiros utilizam poucos tamanhos e cores, as imagens criadas são armazenadas e
+    compartilhadas entre todas as pinturas. Elas não devem ser modificadas.
+
+    :param size: o tamanho da imagem, em pixels.
+    :param color: a cor da imagem, no formato 0xAARRGGBB.
+    :return: a imagem preenchida.
+    """
+    return PIL.Image.new("RGBA", size, _parse_color(color))
+
+
+@functools.lru_cache(maxsize=None)
+def _font(size: int) -> PIL.ImageFont:
+    """
+    Carrega a fonte utilizada nos textos das imagens.
+
+    :param size: o tamanho da fonte.
+    :return: a fonte carregada, que é reutilizada em chamadas posteriores com o mesmo tamanho.
+    """
+    return PIL.ImageFont.truetype(utils.get_res("arial.ttf"), size)
+
+
+@functools.lru_cache(maxsize=16)
+def _frame_img(size: Tuple[int, int], title: str) -> PIL.Image:
+    """
+    Cria o fundo de uma imagem salva, com o cabeçalho branco e o título já escritos.
+
+    Os títulos se repetem a cada geração, enquanto apenas os subtítulos mudam, então os fundos criados são armazenados.
+    Eles não devem ser modificados.
+
+    :param size: o tamanho da imagem do grupo de tabuleiros, sem o cabeçalho.
+    :param title: o título da imagem.
+    :return: o fundo da imagem.
+    """
+    img_w, img_h = size
+    img = PIL.Image.new("RGBA", (img_w, img_h + 200), _parse_color(0xFFFFFFFF))
+    PIL.ImageDraw.Draw(img).text((10, 10), title, _parse_color(0xFF000000), font=_font(36))
+    return img
+
+
+def _open_res(name: str) -> PIL.Image:
+    """
+    Abre e decodifica uma imagem da pasta de recursos.
+
+    :param name: o nome da imagem.
+    :return: a imagem, com os pixels já decodificados, de forma que cópias posteriores não precisem decodificá-la.
+    """
+    img = PIL.Image.open(utils.get_res(name))
+    img.load()
+    return img
+
+
+_BOARD_IMG = _open_res("board.png")
+"""
+A imagem de um tabuleiro vazio.
+"""
+
+_QUEEN_IMG = _open_res("queen.png")
+"""
+A imagem de uma rainha.
+"""
+
+
 class BoardBuilder:
     """
     Manipula a imagem de um tabuleiro.
     """
 
-    def __init__(self, board_img: PIL.Image, queen_img: PIL.Image):
+    def __init__(self, board_img: PIL.Image, queen_img: PIL.Image, shared: bool = False):
         """
         Constrói um `BoardBuilder`.
 
         :param board_img: a imagem contendo o tabuleiro.
         :param queen_img: a imagem contendo a rainha.
+        :param shared: se a imagem do tabuleiro é compartilhada com outros objetos. Nesse caso, ela é copiada apenas
+            quando esse tabuleiro for modificado pela primeira vez.
         """
         self._board_img: PIL.Image = board_img
         self._queen_img: PIL.Image = queen_img
+        self._shared = shared
+
+        # O vetor cujas rainhas ainda não foram desenhadas, enquanto o tabuleiro não for modificado
+        self._array: Optional[Tuple[int, ...]] = None
+
+        # O tabuleiro padrão é opaco e continua opaco com as rainhas, mas não depois de uma pintura
+        self._opaque = board_img is _BOARD_IMG
+
+    def _own(self):
+        """
+        Copia a imagem desse tabuleiro caso ela seja compartilhada, de forma que ela possa ser modificada.
+        """
+        if self._shared:
+            self._board_img = self._board_img.copy()
+            self._shared = False
+            if self._array is not None:
+                # As rainhas do vetor são desenhadas apenas quando o tabuleiro é modificado
+                self._draw(self._array)
 
     def _mark(self, r: int, c: int):
         """
@@ -101,12 +242,29 @@ class BoardBuilder:
         if c > 7:
             raise ValueError("coluna não pode exceder o tabuleiro")
 
-        self._board_img.paste(self._queen_img, (100 * (r + 1), 100 * (c + 1)), self._queen_img)
+        self._own()
+        # A rainha é composta diretamente sobre a região da casa, sem a busca de uma máscara separada
+        self._board_img.alpha_composite(self._queen_img, (100 * (r + 1), 100 * (c + 1)))
 
     def create(self, array: List[int]) -> 'BoardBuilder':
         """
         Cria um tabuleiro com rainhas.
 
+        :param array: um vetor contendo as colunas de cada rainha.
+        :return: esse objeto.
+        """
+        if self._shared and self._board_img is _BOARD_IMG and self._queen_img is _QUEEN_IMG:
+            # O tabuleiro ainda não foi modificado, então as rainhas são desenhadas apenas se ele for modificado ou
+            # caso a redução desse vetor ainda não esteja armazenada
+            self._array = tuple(array)
+            return self
+
+        return self._draw(array)
+
+    def _draw(self, array: List[int]) -> 'BoardBuilder':
+        """
+        Cola as imagens das rainhas de um vetor nesse tabuleiro.
+
         :param array: um vetor contendo as colunas de cada rainha.
         :return: esse objeto.
         """
@@ -125,7 +283,9 @@ class BoardBuilder:
         :return: esse objeto.
         """
         size = c1 - c0 + 1
-        fill_img = PIL.Image.new("RGBA", (100 * size, 802), _parse_color(color))
+        fill_img = _solid_img((100 * size, 802), color)
+        self._own()
+        self._opaque = False
         self._board_img.paste(fill_img, (100 * (c0 + 1), 100), fill_img)
         return self
 
@@ -138,16 +298,51 @@ class BoardBuilder:
         :param color: a cor a ser utilizada na pintura, no formato 0xAARRGGBB.
         :return: esse objeto.
         """
-        fill_img = PIL.Image.new("RGBA", (100, 100), _parse_color(color))
+        fill_img = _solid_img((100, 100), color)
+        self._own()
+        self._opaque = False
         self._board_img.paste(fill_img, (100 * (r + 1), 100 * (c + 1)), fill_img)
         return self
 
     def get(self) -> PIL.Image:
         """
-        :return: a imagem desse tabuleiro.
+        :return: a imagem desse tabuleiro, que pode ser modificada sem afetar outros tabuleiros.
         """
+        # Um tabuleiro compartilhado é copiado, e as rainhas ainda não desenhadas são desenhadas
+        self._own()
         return self._board_img
 
+    def thumbnail(self, size: Tuple[int, int]) -> PIL.Image:
+        """
+        Reduz a imagem desse tabuleiro, composta sobre um fundo preto.
+
+        :param size: o tamanho da imagem reduzida, em pixels.
+        :return: a imagem reduzida. A imagem desse tabuleiro não é modificada.
+        """
+        if self._shared and self._array is not None:
+            # O tabuleiro não foi modificado, então a mesma redução já pode ter sido feita em outra etapa
+            return _queens_thumbnail(self._array, size)
+
+        # Uma imagem opaca não é alterada pelo fundo preto, então pode ser reduzida diretamente, sem ser copiada
+        img = self._board_img if self._opaque else _copy(self._board_img)
+        return img.resize(size, LANCZOS, reducing_gap=2.0)
+
+
+@functools.lru_cache(maxsize=128)
+def _queens_thumbnail(array: Tuple[int, ...], size: Tuple[int, int]) -> PIL.Image:
+    """
+    Reduz a imagem das rainhas de um vetor sobre o tabuleiro padrão.
+
+    Cada estado costuma ser desenhado várias vezes em uma mesma geração (seleção, cruzamento, mutação e seleção
+    natural), então apenas as reduções são armazenadas, e não os tabuleiros de cerca de 4 MB.
+
+    :param array: um vetor contendo as colunas de cada rainha.
+    :param size: o tamanho da imagem reduzida, em pixels.
+    :return: a imagem reduzida, que não deve ser modificada.
+    """
+    board_img = BoardBuilder(_BOARD_IMG, _QUEEN_IMG, shared=True)._draw(array).get()
+    return board_img.resize(size, LANCZOS, reducing_gap=2.0)
+
 
 class BoardGroupBuilder:
     """
@@ -158,8 +353,8 @@ class BoardGroupBuilder:
             self,
             size: int,
             /,
-            board_img: PIL.Image = PIL.Image.open(utils.get_res("board.png")),
-            queen_img: PIL.Image = PIL.Image.open(utils.get_res("queen.png")),
+            board_img: PIL.Image = _BOARD_IMG,
+            queen_img: PIL.Image = _QUEEN_IMG,
             out_img_size: Tuple[int, int] = (1000, 1000),
     ):
         """
@@ -185,7 +380,21 @@ class BoardGroupBuilder:
         self._in_img_size = (in_img_w, in_img_h)
         self._img = PIL.Image.new("RGBA", out_img_size, (0x00, 0x00, 0x00, 0xFF))
 
-        self._builders = [BoardBuilder(_copy(board_img), queen_img) for _ in range(size)]
+        self._board_img = board_img
+        self._queen_img = queen_img
+        self._builders: List[BoardBuilder] = []
+        self.reset()
+
+    def reset(self) -> 'BoardGroupBuilder':
+        """
+        Volta esse grupo para tabuleiros vazios, reaproveitando a imagem do grupo.
+
+        :return: esse objeto.
+        """
+        # Os tabuleiros compartilham a imagem já decodificada, que é copiada apenas quando um tabuleiro é modificado
+        self._builders = [BoardBuilder(self._board_img, self._queen_img, shared=True) for _ in range(self._size)]
+        self._img.paste((0x00, 0x00, 0x00, 0xFF), (0, 0) + self._img.size)
+        return self
 
     def apply(self, index: int, action: Callable[[BoardBuilder], None]) -> 'BoardGroupBuilder':
         """
@@ -204,13 +413,10 @@ class BoardGroupBuilder:
         """
         in_img_w, in_img_h = self._in_img_size
         for i in range(self._size):
-            builder_img = self._builders[i].get()
-
             ii, ij = i // self._sq_h, i % self._sq_h
-            copy_img = _copy(builder_img)
-            copy_img.thumbnail(self._in_img_size, PIL.Image.ANTIALIAS)
+            thumbnail_img = self._builders[i].thumbnail(self._in_img_size)
 
-            self._img.paste(copy_img, (ij * in_img_w, ii * in_img_h), copy_img)
+            self._img.paste(thumbnail_img, (ij * in_img_w, ii * in_img_h), thumbnail_img)
 
         return self._img
 
@@ -320,6 +526,32 @@ class SolverListener:
         """
         pass
 
+    def flush(self):
+        """
+        Aguarda a conclusão das ações desse listener que ainda estejam sendo realizadas em segundo plano.
+        """
+        pass
+
+    def on_finish(self):
+        """
+        Define uma ação a ser realizada quando o algoritmo termina, depois da última etapa.
+        """
+        pass
+
+
+_PHASES = frozenset({'population', 'selection', 'crossing', 'mutation', 'natural_selection', 'solution'})
+"""
+As etapas do algoritmo que podem ser mostradas nas imagens: a criação da população inicial, a seleção, o cruzamento,
+a mutação, a seleção natural e a solução ótima encontrada.
+"""
+
+
+_SAVE_EXECUTOR = ThreadPoolExecutor(max_workers=os.cpu_count())
+"""
+Codifica as imagens em PNG em segundo plano, enquanto as próximas imagens são montadas. É compartilhado por todos os
+listeners, já que um novo listener é criado a cada execução do algoritmo.
+"""
+
 
 class BoardBuilderListener(SolverListener):
     """
@@ -327,29 +559,31 @@ class BoardBuilderListener(SolverListener):
     """
 
     @staticmethod
-    def enable(size: int):
+    def enable(size: int, keep_frames: bool = False, stride: int = 1, phases: Optional[Set[str]] = None):
         """
         Inicializa o listener global desse módulo com uma instância desse objeto.
 
         :param size: o tamanho da população inicial.
+        :param keep_frames: se as imagens geradas devem ser mantidas em memória para serem salvas como .gif.
+        :param stride: o intervalo entre as gerações mostradas nas imagens.
+        :param phases: as etapas mostradas nas imagens, dentre as de `_PHASES`. Caso não sejam informadas, todas as
+            etapas são mostradas.
         """
         global listener
-        listener = BoardBuilderListener(size)
+        listener = BoardBuilderListener(size, keep_frames, stride, phases)
 
-    @staticmethod
-    def _compact():
+    def _compact(self):
         """
-        Transforma os arquivos .png no diretório local 'imgs' em .gif.
+        Salva as imagens geradas como um arquivo .gif no diretório local 'imgs'.
 
-        Caso o diretório não exista, nenhuma ação é realizada.
+        As imagens são obtidas da memória, sem decodificar novamente os arquivos .png. Caso esse listener não mantenha
+        as imagens geradas ou nenhuma imagem tenha sido gerada, nenhuma ação é realizada.
         """
-        dir_path = utils.get_child("imgs")
-        if not os.path.isdir(dir_path):
+        if not self._frames:
             return
 
-        input_pattern = os.path.join(dir_path, "output_*.png")
-        output_path = os.path.join(dir_path, "output.gif")
-        img, *imgs = [PIL.Image.open(f) for f in sorted(glob.glob(input_pattern))]
+        output_path = os.path.join(utils.get_child("imgs"), "output.gif")
+        img, *imgs = self._frames
         img.save(fp=output_path, format='GIF', append_images=imgs, save_all=True, duration=1000, loop=0)
 
     @staticmethod
@@ -367,19 +601,37 @@ class BoardBuilderListener(SolverListener):
         for fp in glob.glob(pattern):
             os.remove(fp)
 
-    def __init__(self, size: int):
+    def __init__(self, size: int, keep_frames: bool = False, stride: int = 1, phases: Optional[Set[str]] = None):
         """
         Constrói um `BoardBuilderListener`.
 
         :param size: o tamanho da população inicial.
+        :param keep_frames: se as imagens geradas devem ser mantidas em memória para serem salvas como .gif.
+        :param stride: o intervalo entre as gerações mostradas nas imagens.
+        :param phases: as etapas mostradas nas imagens, dentre as de `_PHASES`. Caso não sejam informadas, todas as
+            etapas são mostradas.
         """
+        if stride < 1:
+            raise ValueError("o intervalo entre as gerações deve ser pelo menos 1")
+        if phases is not None and not phases <= _PHASES:
+            raise ValueError("etapa inválida")
+
         self._size = size
+        self._stride = stride
+        self._phases = _PHASES if phases is None else frozenset(phases)
+        self._generation: int = 0
+
+        # Cada imagem é convertida para uma paleta de cores, como no formato .gif, ocupando um quarto da memória
+        self._frames: Optional[List[PIL.Image]] = [] if keep_frames else None
 
         self._builder: Optional[BoardGroupBuilder] = None
+        self._groups: Dict[int, BoardGroupBuilder] = {}
         self._index: int = 0
 
         self._cutoffs = []
 
+        self._pending: List[Future] = []
+
     def _save(self, title: str = "", subtitle: str = ""):
         """
         Salva uma imagem.
@@ -389,183 +641,216 @@ class BoardBuilderListener(SolverListener):
         """
         img = self._builder.get()
 
-        img_w, img_h = img.size
-        new_img = PIL.Image.new("RGBA", (img_w, img_h + 200), _parse_color(0xFFFFFFFF))
+        # Cada imagem é salva em segundo plano, então é montada sobre uma cópia do cabeçalho, e não sobre uma imagem
+        # reaproveitada entre as chamadas
+        new_img = _frame_img(img.size, title).copy()
         new_img.paste(img, (0, 200), img)
 
         draw = PIL.ImageDraw.Draw(new_img)
-        for pos, text, size in (((10, 10), title, 36), ((10, 60), subtitle, 30)):
-            draw.text(
-                pos,
-                text,
-                _parse_color(0xFF000000),
-                font=PIL.ImageFont.truetype(utils.get_res("arial.ttf"), size),
-            )
+        draw.text(
+            (10, 60),
+            subtitle,
+            _parse_color(0xFF000000),
+            font=_font(30),
+        )
 
         dir_path = utils.get_child("imgs")
         if not os.path.isdir(dir_path):
             os.mkdir(dir_path)
 
         filename = os.path.join(dir_path, f"output_{self._index:07d}.png")
-        new_img.save(filename)
+        # As imagens são intermediárias, então a velocidade da compressão é priorizada em vez do tamanho do arquivo
+        self._pending.append(_SAVE_EXECUTOR.submit(new_img.save, filename, compress_level=1))
         self._index += 1
 
+        if self._frames is not None:
+            self._frames.append(new_img.quantize(method=PIL.Image.FASTOCTREE))
+
+    def _renders(self, phase: str) -> bool:
+        """
+        Verifica se uma etapa da geração atual é mostrada nas imagens.
+
+        As etapas que não são mostradas não são salvas nem pintadas. Porém, os tabuleiros de cada etapa continuam sendo
+        criados, pois são a base das pinturas da etapa seguinte.
+
+        :param phase: o nome da etapa.
+        :return: se a etapa é mostrada.
+        """
+        if phase not in self._phases:
+            return False
+        # A população inicial e a solução ótima são mostradas independentemente do intervalo entre as gerações
+        return phase in ('population', 'solution') or self._generation % self._stride == 0
+
+    def _reset_builder(self, size: int):
+        """
+        Passa a montar uma nova imagem de um grupo de tabuleiros.
+
+        Como cada imagem já foi copiada ao ser salva, o mesmo grupo é reaproveitado para todas as imagens com esse
+        número de tabuleiros.
+
+        :param size: o número de tabuleiros no grupo.
+        """
+        group = self._groups.get(size)
+        if group is None:
+            group = self._groups[size] = BoardGroupBuilder(size)
+        self._builder = group.reset()
+
+    def flush(self):
+        """
+        Aguarda o salvamento das imagens que ainda estejam sendo salvas em segundo plano.
+        """
+        for future in self._pending:
+            future.result()
+        self._pending = []
+
+    def on_finish(self):
+        self.flush()
+        self._compact()
+
     def on_population_created(self, states: List[State]):
-        self._builder = BoardGroupBuilder(self._size)
+        self._reset_builder(self._size)
         for i, state in enumerate(states):
-            self._builder.apply(i, lambda b: b.create([v + 1 for v in state.array.iterate(8)]))
-        self._save(
-            "Criando população inicial",
-            f"Melhor fitness: {max(states, key=lambda s: s.fitness).fitness}\n"
-            f"Pior fitness: {min(states, key=lambda s: s.fitness).fitness}\n"
-            f"Média de fitness: {statistics.mean(s.fitness for s in states)}\n"
-            f"Tamanho: {len(states)}\n"
-        )
+            self._builder.apply(i, lambda b, cols=_columns(state): b.create(cols))
+        if self._renders('population'):
+            self._save(
+                "Criando população inicial",
+                _describe_fitness(states) + f"Tamanho: {len(states)}\n"
+            )
         self._cache = states
 
     def on_solution_found(self, index: int):
-        self._builder.apply(index, lambda b: b.fill(0, 7, color=0x80FFFF00))
-        self._save("Solução ótima encontrada")
+        if self._renders('solution'):
+            self._builder.apply(index, lambda b: b.fill(0, 7, color=0x80FFFF00))
+            self._save("Solução ótima encontrada")
 
     def on_pre_population_selected(self, indexes: Set[int]):
-        for index in indexes:
-            self._builder.apply(index, lambda b: b.fill(0, 7, color=0x5200FF00))
-
-        # noinspection PyTypeChecker
-        states: List[State] = self._cache
-        self._save(
-            "Selecionando melhores indivíduos",
-            f"Melhor fitness: {max(states, key=lambda s: s.fitness).fitness}\n"
-            f"Pior fitness: {min(states, key=lambda s: s.fitness).fitness}\n"
-            f"Média de fitness: {statistics.mean(s.fitness for s in states)}\n"
-            f"Método: Torneio ({len(indexes)} indivíduos distintos selecionados)\n"
-        )
+        if self._renders('selection'):
+            for index in indexes:
+                self._builder.apply(index, lambda b: b.fill(0, 7, color=0x5200FF00))
+
+            # noinspection PyTypeChecker
+            states: List[State] = self._cache
+            self._save(
+                "Selecionando melhores indivíduos",
+                _describe_fitness(states) + f"Método: Torneio ({len(indexes)} indivíduos distintos selecionados)\n"
+            )
         self._cache = indexes
 
     def on_post_population_selected(self, selected_states: List[State]):
-        self._builder = BoardGroupBuilder(self._size)
+        self._reset_builder(self._size)
         for i, state in enumerate(selected_states):
-            self._builder.apply(i, lambda b: b.create([v + 1 for v in state.array.iterate(8)]))
-
-        indexes = self._cache
-        self._save(
-            "Selecionando melhores indivíduos",
-            f"Melhor fitness: {max(selected_states, key=lambda s: s.fitness).fitness}\n"
-            f"Pior fitness: {min(selected_states, key=lambda s: s.fitness).fitness}\n"
-            f"Média de fitness: {statistics.mean(s.fitness for s in selected_states)}\n"
-            f"Método: Torneio ({len(indexes)} indivíduos distintos selecionados)\n",
-        )
+            self._builder.apply(i, lambda b, cols=_columns(state): b.create(cols))
+
+        if self._renders('selection'):
+            indexes = self._cache
+            self._save(
+                "Selecionando melhores indivíduos",
+                _describe_fitness(selected_states)
+                + f"Método: Torneio ({len(indexes)} indivíduos distintos selecionados)\n",
+            )
         self._cache = selected_states
 
     def on_hit_crossing_over(self, p0i: int, p1i: int, cutoff: int):
-        self._builder \
-            .apply(p0i, lambda b: b.fill(0, cutoff).fill(cutoff + 1, 7, color=0x800000FF)) \
-            .apply(p1i, lambda b: b.fill(0, cutoff, color=0x800000FF).fill(cutoff + 1, 7))
+        if self._renders('crossing'):
+            self._builder \
+                .apply(p0i, lambda b: b.fill(0, cutoff).fill(cutoff + 1, 7, color=0x800000FF)) \
+                .apply(p1i, lambda b: b.fill(0, cutoff, color=0x800000FF).fill(cutoff + 1, 7))
 
         self._cutoffs.append(p0i)
         self._cutoffs.append(p1i)
 
     def on_miss_crossing_over(self, p0i: int, p1i: int):
-        self._builder \
-            .apply(p0i, lambda b: b.fill(0, 8, color=0x52000000)) \
-            .apply(p1i, lambda b: b.fill(0, 8, color=0x52000000))
+        if self._renders('crossing'):
+            self._builder \
+                .apply(p0i, lambda b: b.fill(0, 8, color=0x52000000)) \
+                .apply(p1i, lambda b: b.fill(0, 8, color=0x52000000))
 
         self._cutoffs.append(None)
         self._cutoffs.append(None)
 
     def on_post_crossing_over(self, children_states: List[State]):
-        states = self._cache
-        self._save(
-            "Realizando cruzamento (1)",
-            f"Melhor fitness: {max(states, key=lambda s: s.fitness).fitness}\n"
-            f"Pior fitness: {min(states, key=lambda s: s.fitness).fitness}\n"
-            f"Média de fitness: {statistics.mean(s.fitness for s in states)}\n"
-            "Taxa de cruzamento: 80%\n",
-        )
+        if self._renders('crossing'):
+            states = self._cache
+            self._save(
+                "Realizando cruzamento (1)",
+                _describe_fitness(states) + "Taxa de cruzamento: 80%\n",
+            )
 
-        self._builder = BoardGroupBuilder(self._size)
-        for i, state in enumerate(children_states):
-            cutoff = self._cutoffs[i]
-            color = 0x00000000 if cutoff is None else 0x52FF0000 if i % 2 == 0 else 0x520000FF
-            self._builder.apply(i, lambda b: b.create([v + 1 for v in state.array.iterate(8)]).fill(0, 7, color=color))
-        self._save(
-            "Realizando cruzamento (2)",
-            f"Melhor fitness: {max(children_states, key=lambda s: s.fitness).fitness}\n"
-            f"Pior fitness: {min(children_states, key=lambda s: s.fitness).fitness}\n"
-            f"Média de fitness: {statistics.mean(s.fitness for s in children_states)}\n"
-            "Taxa de cruzamento: 80%\n",
-        )
+            self._reset_builder(self._size)
+            for i, state in enumerate(children_states):
+                cutoff = self._cutoffs[i]
+                color = 0x00000000 if cutoff is None else 0x52FF0000 if i % 2 == 0 else 0x520000FF
+                self._builder.apply(
+                    i,
+                    lambda b, cols=_columns(state), color=color: b.create(cols).fill(0, 7, color=color),
+                )
+            self._save(
+                "Realizando cruzamento (2)",
+                _describe_fitness(children_states) + "Taxa de cruzamento: 80%\n",
+            )
 
-        self._builder = BoardGroupBuilder(self._size)
+        self._reset_builder(self._size)
         for i, state in enumerate(children_states):
-            self._builder.apply(i, lambda b: b.create([v + 1 for v in state.array.iterate(8)]))
-        self._save(
-            "Realizando cruzamento (2)",
-            f"Melhor fitness: {max(children_states, key=lambda s: s.fitness).fitness}\n"
-            f"Pior fitness: {min(children_states, key=lambda s: s.fitness).fitness}\n"
-            f"Média de fitness: {statistics.mean(s.fitness for s in children_states)}\n"
-            "Taxa de cruzamento: 80%\n",
-        )
+            self._builder.apply(i, lambda b, cols=_columns(state): b.create(cols))
+        if self._renders('crossing'):
+            self._save(
+                "Realizando cruzamento (2)",
+                _describe_fitness(children_states) + "Taxa de cruzamento: 80%\n",
+            )
 
         self._cutoffs = []
 
     def on_mutate(self, index: int):
-        self._builder.apply(index, lambda b: b.fill(0, 7, color=0x520000FF))
+        if self._renders('mutation'):
+            self._builder.apply(index, lambda b: b.fill(0, 7, color=0x520000FF))
 
     def on_post_mutate(self, children_states: List[State]):
-        self._save(
-            "Realizando mutação (1)",
-            f"Melhor fitness: {max(children_states, key=lambda s: s.fitness).fitness}\n"
-            f"Pior fitness: {min(children_states, key=lambda s: s.fitness).fitness}\n"
-            f"Média de fitness: {statistics.mean(s.fitness for s in children_states)}\n"
-            "Taxa de mutação: 3%\n",
-        )
+        if self._renders('mutation'):
+            self._save(
+                "Realizando mutação (1)",
+                _describe_fitness(children_states) + "Taxa de mutação: 3%\n",
+            )
 
-        self._builder = BoardGroupBuilder(self._size)
-        for i, state in enumerate(children_states):
-            self._builder.apply(i, lambda b: b.create([v + 1 for v in state.array.iterate(8)]))
-        self._save(
-            "Realizando mutação (2)",
-            f"Melhor fitness: {max(children_states, key=lambda s: s.fitness).fitness}\n"
-            f"Pior fitness: {min(children_states, key=lambda s: s.fitness).fitness}\n"
-            f"Média de fitness: {statistics.mean(s.fitness for s in children_states)}\n"
-            "Taxa de mutação: 3%\n"
-        )
+            self._reset_builder(self._size)
+            for i, state in enumerate(children_states):
+                self._builder.apply(i, lambda b, cols=_columns(state): b.create(cols))
+            self._save(
+                "Realizando mutação (2)",
+                _describe_fitness(children_states) + "Taxa de mutação: 3%\n"
+            )
 
     def on_merging(self, merged_states: List[State]):
-        self._builder = BoardGroupBuilder(self._size * 2)
-        for i, state in enumerate(merged_states):
-            self._builder.apply(i, lambda b: b.create([v + 1 for v in state.array.iterate(8)]))
-        self._save(
-            "Juntando indivíduos pais/filhos",
-            f"Melhor fitness: {max(merged_states, key=lambda s: s.fitness).fitness}\n"
-            f"Pior fitness: {min(merged_states, key=lambda s: s.fitness).fitness}\n"
-            f"Média de fitness: {statistics.mean(s.fitness for s in merged_states)}\n",
-        )
+        if self._renders('natural_selection'):
+            self._reset_builder(self._size * 2)
+            for i, state in enumerate(merged_states):
+                self._builder.apply(i, lambda b, cols=_columns(state): b.create(cols))
+            self._save(
+                "Juntando indivíduos pais/filhos",
+                _describe_fitness(merged_states),
+            )
 
     def on_natural_selection(self, merged_states: List[State], indexes: List[int]):
-        self._builder = BoardGroupBuilder(self._size * 2)
-        for i, state in enumerate(merged_states):
-            self._builder.apply(i, lambda b: b.create([v + 1 for v in state.array.iterate(8)]))
-            if i in indexes:
-                self._builder.apply(i, lambda b: b.fill(0, 7, color=0x5200FF00))
-        self._save(
-            "Selecionando melhores indíviduos",
-            f"Melhor fitness: {max(merged_states, key=lambda s: s.fitness).fitness}\n"
-            f"Pior fitness: {min(merged_states, key=lambda s: s.fitness).fitness}\n"
-            f"Média de fitness: {statistics.mean(s.fitness for s in merged_states)}\n",
-        )
+        if self._renders('natural_selection'):
+            self._reset_builder(self._size * 2)
+            for i, state in enumerate(merged_states):
+                self._builder.apply(i, lambda b, cols=_columns(state): b.create(cols))
+                if i in indexes:
+                    self._builder.apply(i, lambda b: b.fill(0, 7, color=0x5200FF00))
+            self._save(
+                "Selecionando melhores indíviduos",
+                _describe_fitness(merged_states),
+            )
 
-        self._builder = BoardGroupBuilder(self._size)
+        self._reset_builder(self._size)
         selected_states = [merged_states[i] for i in indexes]
         for i, state in enumerate(selected_states):
-            self._builder.apply(i, lambda b: b.create([v + 1 for v in state.array.iterate(8)]))
-        self._save(
-            "Criando nova geração",
-            f"Melhor fitness: {max(selected_states, key=lambda s: s.fitness).fitness}\n"
-            f"Pior fitness: {min(selected_states, key=lambda s: s.fitness).fitness}\n"
-            f"Média de fitness: {statistics.mean(s.fitness for s in selected_states)}\n",
-        )
+            self._builder.apply(i, lambda b, cols=_columns(state): b.create(cols))
+        if self._renders('natural_selection'):
+            self._save(
+                "Criando nova geração",
+                _describe_fitness(selected_states),
+            )
+        self._generation += 1
 
 
 listener: SolverListener = SolverListener()
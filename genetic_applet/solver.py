@@ -1,14 +1,11 @@
-import heapq
-import random
-from typing import List, Tuple, Optional
+from typing import List, Tuple, Optional, Set
 
 from genetic.solution import Solution
 from genetic.solver import GeneticSolver
 from genetic.state import State
-from genetic.utils import pairwise
+from genetic.utils import nlargest_indexes, pairwise
 from genetic_applet import imaging
 from genetic_applet.state import AppletState
-from genetic_applet.utils import IndexedObject
 
 
 class GeneticSolverListener:
@@ -45,94 +42,118 @@ class AppletGeneticSolver(GeneticSolver):
             generation_size: int,
             generate_images: bool,
             listener: Optional[GeneticSolverListener] = None,
+            keep_frames: bool = False,
+            stride: int = 1,
+            phases: Optional[Set[str]] = None,
     ):
         """
         Constrói um `AppletGeneticSolver`.
 
         :param generate_images: se imagens devem ser geradas quando esse algoritmo estiver executando.
         :param listener: o listener a ser notificado quando esse algoritmo estiver executando.
+        :param keep_frames: se as imagens geradas também devem ser salvas como um arquivo .gif quando esse algoritmo
+            terminar.
+        :param stride: o intervalo entre as gerações mostradas nas imagens.
+        :param phases: as etapas mostradas nas imagens, dentre as de `imaging._PHASES`. Caso não sejam informadas, todas
+            as etapas são mostradas.
         """
         super().__init__(population_size, crossing_rate, mutation_rate, generation_size)
         self._generate_images = generate_images
         self._listener = listener
+        self._keep_frames = keep_frames
+        self._stride = stride
+        self._phases = phases
+
+    def _create_states(self, size: int) -> List[State]:
+        # Sem imagens, os estados não precisam informar os pontos de corte e o algoritmo é o mesmo de `GeneticSolver`
+        if not self._generate_images:
+            return super()._create_states(size)
 
-    @staticmethod
-    def _create_states(size: int) -> List[State]:
         return [AppletState.random() for _ in range(size)]
 
     @staticmethod
     def _tournament_selection(states: List[State]) -> List[State]:
-        selected_states = []
-        indexes = set()
-        for _ in states:
-            state = max(random.choices(states, k=2), key=lambda s: s.fitness)
-            indexes.add(states.index(state))
-            selected_states.append(state)
+        winners = GeneticSolver._tournament_winners(states)
+
+        # Estados iguais são destacados pelo índice da sua primeira ocorrência na população
+        first_indexes = {}
+        for i, state in enumerate(states):
+            first_indexes.setdefault(int(state.array), i)
+        indexes = {first_indexes[int(states[i].array)] for i in winners}
 
         imaging.listener.on_pre_population_selected(indexes)
-        return selected_states
+        return [states[i] for i in winners]
 
-    def solve(self) -> Solution:
+    def _evolve(self, states: List[State]) -> List[State]:
         if not self._generate_images:
-            return super().solve()
-
-        self.current_generation = 0
-        imaging.BoardBuilderListener.enable(self._population_size)
-
-        states: List[State] = self._create_states(self._population_size)
-        imaging.listener.on_population_created(states)
-
-        optimal_states: List[State] = [state for state in states if state.is_optimal]
-        while not optimal_states:
-            selected_states: List[State] = AppletGeneticSolver._tournament_selection(states)
-            imaging.listener.on_post_population_selected(selected_states)
-
-            parent_states: List[Tuple[State, State]] = pairwise(selected_states)
-            children_states: List[State] = []
-            for i, (parent_state_0, parent_state_1) in enumerate(parent_states):
-                p0i, p1i = i * 2, i * 2 + 1
-                if random.random() <= self._crossing_rate:
-                    child_state_0, child_state_1, cutoff = parent_state_0.cross(parent_state_1, strategy='cutoff')
-                    imaging.listener.on_hit_crossing_over(p0i, p1i, cutoff)
-                    children_states.append(child_state_0)
-                    children_states.append(child_state_1)
-                else:
-                    imaging.listener.on_miss_crossing_over(p0i, p1i)
-                    children_states.append(parent_state_0)
-                    children_states.append(parent_state_1)
-            imaging.listener.on_post_crossing_over(children_states)
-
-            for i, state in enumerate(children_states):
-                if random.random() <= self._mutation_rate:
-                    imaging.listener.on_mutate(i)
-                    state.mutate(strategy='bitflip')
-            imaging.listener.on_post_mutate(children_states)
-
-            children_states.extend(states)
-            imaging.listener.on_merging(children_states)
-
-            wrappers = heapq.nlargest(
-                self._population_size,
-                IndexedObject.wrap(children_states),
-                key=lambda s: s.value.fitness
-            )
-
-            states = IndexedObject.unwrap_values(wrappers)
-            imaging.listener.on_natural_selection(children_states, IndexedObject.unwrap_indexes(wrappers))
+            return super()._evolve(states)
+
+        selected_states: List[State] = AppletGeneticSolver._tournament_selection(states)
+        imaging.listener.on_post_population_selected(selected_states)
+
+        parent_states: List[Tuple[State, State]] = pairwise(selected_states)
+        crossings: List[bool] = self._draw_events(len(parent_states), self._crossing_rate)
+        cutoffs = iter(State.random_cutoffs(sum(crossings)))
+        children_states: List[State] = []
+        for i, ((parent_state_0, parent_state_1), crossing) in enumerate(zip(parent_states, crossings)):
+            p0i, p1i = i * 2, i * 2 + 1
+            if crossing:
+                child_state_0, child_state_1, cutoff = parent_state_0.cross(parent_state_1, 'cutoff', next(cutoffs))
+                imaging.listener.on_hit_crossing_over(p0i, p1i, cutoff)
+                children_states.append(child_state_0)
+                children_states.append(child_state_1)
+            else:
+                imaging.listener.on_miss_crossing_over(p0i, p1i)
+                children_states.append(parent_state_0)
+                children_states.append(parent_state_1)
+        imaging.listener.on_post_crossing_over(children_states)
+
+        mutations: List[bool] = self._draw_events(len(children_states), self._mutation_rate)
+        for i, (state, mutation) in enumerate(zip(children_states, mutations)):
+            if mutation:
+                imaging.listener.on_mutate(i)
+                state.mutate(strategy='bitflip')
+        imaging.listener.on_post_mutate(children_states)
+
+        children_states.extend(states)
+        imaging.listener.on_merging(children_states)
+
+        indexes: List[int] = nlargest_indexes(State.batch_fitness(children_states), self._population_size)
+        imaging.listener.on_natural_selection(children_states, indexes)
+        return [children_states[i] for i in indexes]
+
+    def _on_population_created(self, states: List[State]):
+        if self._generate_images:
+            imaging.listener.on_population_created(states)
+
+    def _on_new_generation(self):
+        if not self._generate_images:
+            return
 
-            optimal_states = [state for state in states if state.is_optimal]
-            if optimal_states:
-                break
+        # O applet lê do disco as imagens da geração anterior quando é notificado, então elas devem estar salvas. Além
+        # disso, as imagens não ficam acumuladas em memória enquanto aguardam para serem salvas.
+        imaging.listener.flush()
+        if self._listener is not None:
+            self._listener.on_new_generation(self.current_generation)
 
-            self.current_generation += 1
-            if self._listener is not None:
-                self._listener.on_new_generation(self.current_generation)
-            if self.current_generation == self._generation_size:
-                if self._listener is not None:
-                    self._listener.on_finish()
-                return Solution.non_optimal(set(states))
+    def _on_finish(self, states: List[State], has_found: bool):
+        if not self._generate_images:
+            return
 
-        imaging.listener.on_solution_found(max(enumerate(states), key=lambda t: t[1].fitness)[0])
+        if has_found:
+            fitnesses = State.batch_fitness(states)
+            imaging.listener.on_solution_found(fitnesses.index(max(fitnesses)))
+        imaging.listener.on_finish()
         if self._listener is not None:
             self._listener.on_finish()
-        return Solution.optimal(set(optimal_states))
+
+    def solve(self) -> Solution:
+        if self._generate_images:
+            imaging.BoardBuilderListener.enable(
+                self._population_size,
+                keep_frames=self._keep_frames,
+                stride=self._stride,
+                phases=self._phases,
+            )
+
+        return super().solve()
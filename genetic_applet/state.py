@@ -1,8 +1,6 @@
-import random
-from typing import Tuple
+from typing import Optional, Tuple
 
 from genetic.state import State
-from genetic.utils import BitArray
 
 
 class AppletState(State):
@@ -10,8 +8,15 @@ class AppletState(State):
     Modificação de um estado para funcionar de acordo com o applet.
     """
 
-    def _cutoff_cross(self, other: 'AppletState') -> Tuple['AppletState', 'AppletState', int]:
-        cutoff = random.choice(range(1, 7))
-        array_0 = BitArray.from_list([self.array[i] if i <= cutoff else other.array[i] for i in range(8)], 3)
-        array_1 = BitArray.from_list([self.array[i] if i > cutoff else other.array[i] for i in range(8)], 3)
-        return AppletState(array_0), AppletState(array_1), cutoff
+    __slots__ = ()
+
+    def _cutoff_cross(
+            self,
+            other: 'AppletState',
+            cutoff: Optional[int] = None,
+    ) -> Tuple['AppletState', 'AppletState', int]:
+        # O ponto de corte é retornado junto com os filhos para que seja mostrado nas imagens
+        if cutoff is None:
+            cutoff, = State.random_cutoffs(1)
+        child_state_0, child_state_1 = self._cutoff_splice(other, cutoff)
+        return child_state_0, child_state_1, cutoff